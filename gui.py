@@ -1,7 +1,10 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+import time
+import numpy as np
 import yaml
-from datetime import datetime, timedelta
+from collections import defaultdict
+from datetime import datetime
 from server.server import NetworkServer  # Your existing server class
 from logger import Logger  # Your logging class
 
@@ -9,14 +12,65 @@ from logger import Logger  # Your logging class
 from sensors import Sensor, LightSensor, TemperatureSensor, HumiditySensor, AirQualitySensor
 
 CONFIG_FILE = "config.yaml"
+HISTORY_HOURS = 12
+BUCKET_SECONDS = 60
+REDRAW_INTERVAL_MS = 500
+
+
+class BucketedHistory:
+    """
+    Ring of fixed-width time buckets, each holding the (sum, count) of the
+    readings that fell into it. Covers the last HISTORY_HOURS hours.
+    Timestamps are epoch seconds as returned by time.time().
+    """
+
+    def __init__(self, hours=HISTORY_HOURS, bucket_seconds=BUCKET_SECONDS):
+        self.bucket_seconds = bucket_seconds
+        self.size = hours * 3600 // bucket_seconds
+        # Parallel arrays; keys hold the absolute bucket number of each slot (-1 = empty)
+        self.keys = np.full(self.size, -1, dtype=np.int64)
+        self.sums = np.zeros(self.size, dtype=np.float64)
+        self.counts = np.zeros(self.size, dtype=np.int64)
+
+    def _bucket(self, timestamp):
+        return int(timestamp) // self.bucket_seconds
+
+    def add(self, timestamp, value):
+        key = self._bucket(timestamp)
+        slot = key % self.size
+        current = self.keys[slot]
+        if current != key:
+            if current > key:
+                return  # older than the whole window
+            # Slot still holds a bucket from the previous lap of the ring
+            self.keys[slot] = key
+            self.sums[slot] = 0.0
+            self.counts[slot] = 0
+        self.sums[slot] += value
+        self.counts[slot] += 1
+
+    def average(self, hours, now):
+        newest = self._bucket(now)
+        oldest = newest - hours * 3600 // self.bucket_seconds
+        valid = (self.keys > oldest) & (self.keys <= newest)
+        count = self.counts[valid].sum()
+        if count == 0:
+            return None
+        return float(self.sums[valid].sum() / count)
+
 
 class ServerGUI:
-    def __init__(self, root):
+    def __init__(self, root, enable_network=True):
         self.root = root
         self.root.title("Network Server GUI")
+        self.enable_network = enable_network
         self.running = False
         self.sensors = []
-        self.history = {}
+        self._sensor_meta = []
+        self.history = defaultdict(BucketedHistory)
+        self._row_iids = set()
+        self._dirty = False
+        self._redraw_job = None
         self.network_server = None
         self.logger = Logger("config.json")
 
@@ -61,8 +115,8 @@ class ServerGUI:
 
         # Bottom panel – status bar
         self.status_var = tk.StringVar(value="Server stopped")
-        status_bar = tk.Label(self.root, textvariable=self.status_var, bd=1, relief=tk.SUNKEN, anchor=tk.W)
-        status_bar.pack(fill=tk.X)
+        self.status_bar = tk.Label(self.root, textvariable=self.status_var, bd=1, relief=tk.SUNKEN, anchor=tk.W)
+        self.status_bar.pack(fill=tk.X)
 
     def start_server(self):
         try:
@@ -73,25 +127,33 @@ class ServerGUI:
             if self.network_server is not None:
                 self.network_server.stop()
 
-            # Create and start network server with callback
-            self.network_server = NetworkServer(port=port, on_data_received=self.on_data_received)
-            self.network_server.start()
+            if self.enable_network:
+                # Create and start network server with callback
+                self.network_server = NetworkServer(port=port, on_data_received=self.on_data_received)
+                self.network_server.start()
+                status = f"Server listening on port {port}..."
+            else:
+                status = "Simulated sensors only (network disabled)"
 
             self.running = True
             self.start_button.config(state=tk.DISABLED)
             self.stop_button.config(state=tk.NORMAL)
-            self.status_var.set(f"Server listening on port {port}...")
+            self.status_var.set(status)
 
             # Initialize simulated sensors (optional, can be skipped)
             self.init_sensors()
 
             # Start GUI update loop
             self.update_loop()
+            self._redraw_job = self.root.after(REDRAW_INTERVAL_MS, self._maybe_redraw)
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
     def stop_server(self):
         self.running = False
+        if self._redraw_job is not None:
+            self.root.after_cancel(self._redraw_job)
+            self._redraw_job = None
         if self.network_server:
             self.network_server.stop()
             self.network_server = None
@@ -111,23 +173,25 @@ class ServerGUI:
         for sensor in self.sensors:
             sensor.start()
             sensor.register_callback(self.log_reading)
-            self.history[sensor.sensor_id] = []
-
-    def log_reading(self, sensor_id, timestamp, value, unit):
-        if sensor_id not in self.history:
-            self.history[sensor_id] = []
-        self.history[sensor_id].append((timestamp, value))
 
-        cutoff = datetime.now() - timedelta(hours=12)
-        self.history[sensor_id] = [(ts, val) for ts, val in self.history[sensor_id] if ts > cutoff]
+        # Per-row data that never changes, resolved once instead of on every refresh
+        self._sensor_meta = [(s.sensor_id, s.unit, s.get_last_value) for s in self.sensors]
 
+    def log_reading(self, sensor_id, timestamp, value, unit):
+        # Callbacks fire right after the reading, so the current clock avoids a datetime conversion
+        self.history[sensor_id].add(time.time(), value)
         self.logger.log_reading(sensor_id, timestamp, value, unit)
 
     def on_data_received(self, data):
         # Called from NetworkServer thread — use root.after for thread safety
         def handle():
             try:
-                timestamp = datetime.fromisoformat(data["timestamp"])
+                if "timestamp_ns" in data:
+                    timestamp = int(data["timestamp_ns"])
+                    epoch_seconds = timestamp / 1e9
+                else:
+                    timestamp = datetime.fromisoformat(data["timestamp"])
+                    epoch_seconds = timestamp.timestamp()
                 sensor_id = data["sensor_id"]
                 value = float(data["value"])
                 unit = data["unit"]
@@ -136,18 +200,15 @@ class ServerGUI:
                 self.logger.log_reading(sensor_id, timestamp, value, unit)
 
                 # Update history for averages
-                if sensor_id not in self.history:
-                    self.history[sensor_id] = []
-                self.history[sensor_id].append((timestamp, value))
-                cutoff = datetime.now() - timedelta(hours=12)
-                self.history[sensor_id] = [(ts, val) for ts, val in self.history[sensor_id] if ts > cutoff]
+                self.history[sensor_id].add(epoch_seconds, value)
 
                 # Update simulated sensor last value if exists
                 for sensor in self.sensors:
                     if sensor.sensor_id == sensor_id:
                         sensor._last_value = value
 
-                self.update_table()
+                # Redrawn by _maybe_redraw, so bursts of packets cost one table update
+                self._dirty = True
 
             except Exception as e:
                 print(f"Error processing incoming data: {e}")
@@ -158,47 +219,83 @@ class ServerGUI:
         if not self.running:
             return
 
+        # Read every sensor first, then touch Tk once for the whole tick
+        errors = []
+        timestamp = datetime.now()  # shared by every reading in this tick
         for sensor in self.sensors:
             try:
-                sensor.read_value()
+                sensor.read_value(timestamp)
             except Exception as e:
-                self.status_var.set(f"Error: {str(e)}")
+                errors.append(str(e))
 
-        self.update_table()
+        if errors:
+            self.status_var.set(f"Error: {'; '.join(errors)}")
+
+        # Shares the redraw with any network readings that arrived in the meantime
+        self._dirty = True
         self.root.after(3000, self.update_loop)
 
-    def calculate_average(self, sensor_id, hours):
-        now = datetime.now()
-        values = [
-            val for ts, val in self.history.get(sensor_id, [])
-            if ts > now - timedelta(hours=hours)
-        ]
-        if not values:
+    def _maybe_redraw(self):
+        if not self.running:
+            self._redraw_job = None
+            return
+
+        if self._dirty:
+            self._dirty = False
+            self.update_table()
+        self._redraw_job = self.root.after(REDRAW_INTERVAL_MS, self._maybe_redraw)
+
+    def calculate_average(self, sensor_id, hours, now=None):
+        history = self.history.get(sensor_id)
+        if history is None:
             return "-"
-        return f"{sum(values)/len(values):.2f}"
+        average = history.average(hours, time.time() if now is None else now)
+        if average is None:
+            return "-"
+        return f"{average:.2f}"
 
     def update_table(self):
-        # Clear table
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-
-        # Insert rows
-        for sensor in self.sensors:
-            sensor_id = sensor.sensor_id
-            value = sensor.get_last_value()
-            unit = sensor.unit
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            avg_1h = self.calculate_average(sensor_id, 1)
-            avg_12h = self.calculate_average(sensor_id, 12)
-
-            self.tree.insert("", "end", values=(
+        # Rows are keyed by sensor id and updated in place instead of being rebuilt
+        new_rows = []
+        # One clock read per refresh, shared by every row
+        now = time.time()
+        timestamp = datetime.fromtimestamp(now).isoformat(" ", "seconds")
+        for sensor_id, unit, get_last_value in self._sensor_meta:
+            value = get_last_value()
+            avg_1h = self.calculate_average(sensor_id, 1, now)
+            avg_12h = self.calculate_average(sensor_id, 12, now)
+
+            values = (
                 sensor_id,
                 f"{value:.2f}",
                 unit,
                 timestamp,
                 avg_1h,
                 avg_12h
-            ))
+            )
+            iid = str(sensor_id)
+            if iid in self._row_iids:
+                self.tree.item(iid, values=values)
+            else:
+                new_rows.append((iid, values))
+
+        if new_rows:
+            self.insert_rows(new_rows)
+
+    def insert_rows(self, rows):
+        if self._row_iids:
+            for iid, values in rows:
+                self.tree.insert("", "end", iid=iid, values=values)
+                self._row_iids.add(iid)
+            return
+
+        # Initial fill: detach the table so it is laid out once, and insert in
+        # reverse at index 0, which Tk does without walking the sibling list
+        self.tree.pack_forget()
+        for iid, values in reversed(rows):
+            self.tree.insert("", 0, iid=iid, values=values)
+            self._row_iids.add(iid)
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=5, before=self.status_bar)
 
     def on_closing(self):
         self.running = False
@@ -1,11 +1,41 @@
 import os
 import json
 import csv
+import functools
 from datetime import datetime, timedelta
-from typing import Dict, Iterator, Optional
+from typing import Dict, Iterator, Optional, Tuple, Union
+import queue
+import threading
+import time
 import zipfile
 import glob
 
+WRITE_BUFFER_SIZE = 1 << 20  # 1 MiB
+ARCHIVE_COMPRESSLEVEL = 1
+
+
+@functools.lru_cache(maxsize=None)
+def _pandas():
+    """
+    Importuje pandas przy pierwszym odczycie logów - import trwa kilkaset ms, a zapis go nie potrzebuje.
+    Zwraca None, gdy pandas nie jest dostępny lub jest starszy niż 2.
+    """
+    try:
+        import pandas as pd
+    except ImportError:  # pandas jest opcjonalny - bez niego logi czytane są modułem csv
+        return None
+
+    # _read_frame korzysta z format="ISO8601", dostępnego dopiero w pandas 2
+    if int(pd.__version__.split(".")[0]) < 2:
+        return None
+    return pd
+
+
+def _from_ns(timestamp_ns: int) -> datetime:
+    """Zamienia czas w nanosekundach od epoki na datetime (z dokładnością do mikrosekund)."""
+    seconds, ns = divmod(timestamp_ns, 1_000_000_000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=ns // 1000)
+
 
 class Logger:
     def __init__(self, config_path: str):
@@ -27,7 +57,7 @@ class Logger:
 
         # Utworzenie katalogów jeśli nie istnieją
         os.makedirs(self.log_dir, exist_ok=True)
-        os.makedirs(os.path.join(self.log_dir, "archive"), exist_ok=True)
+        os.makedirs(os.path.join(self.log_dir, "archive", "pending"), exist_ok=True)
 
         # Inicjalizacja bufora i stanu
         self.buffer = []
@@ -36,6 +66,12 @@ class Logger:
         self.current_filename = None
         self.last_rotation_time = None
         self.line_count = 0
+        self.bytes_written = 0
+
+        # Archiwizacja i retencja wykonywane w tle, aby rotacja nie blokowała log_reading
+        self._work_q = queue.Queue()
+        self._worker = threading.Thread(target=self._archive_worker, daemon=True)
+        self._worker.start()
 
         # Otwarcie pliku
         self.start()
@@ -51,8 +87,8 @@ class Logger:
         # Sprawdzenie czy plik istnieje (czy trzeba dodać nagłówek)
         file_exists = os.path.exists(filepath)
 
-        # Otwarcie pliku w trybie append
-        self.current_file = open(filepath, 'a', newline='')
+        # Otwarcie pliku w trybie append (duży bufor - zapis na dysk całymi paczkami)
+        self.current_file = open(filepath, 'a', newline='', buffering=WRITE_BUFFER_SIZE)
         self.current_writer = csv.writer(self.current_file)
 
         # Jeśli plik nie istniał, dodaj nagłówek
@@ -60,13 +96,21 @@ class Logger:
             self.current_writer.writerow(["timestamp", "sensor_id", "value", "unit"])
             self.line_count = 0
 
-        # Ustawienie czasu ostatniej rotacji
-        self.last_rotation_time = datetime.now()
+        self.bytes_written = self.current_file.tell()
+
+        # Ustawienie czasu ostatniej rotacji (zegar monotoniczny, w sekundach)
+        self.last_rotation_time = time.monotonic()
 
     def stop(self) -> None:
         """
         Wymusza zapis bufora i zamyka bieżący plik.
+        Czeka również na zakończenie zaległej archiwizacji.
         """
+        self._close_file()
+        self._work_q.join()
+
+    def _close_file(self) -> None:
+        """Zapisuje bufor i zamyka bieżący plik."""
         if self.buffer:
             self._flush_buffer()
 
@@ -78,22 +122,21 @@ class Logger:
     def log_reading(
             self,
             sensor_id: str,
-            timestamp: datetime,
+            timestamp: Union[datetime, int],
             value: float,
             unit: str
     ) -> None:
         """
         Dodaje wpis do bufora i ewentualnie wykonuje rotację pliku.
+        :param timestamp: datetime lub liczba nanosekund od epoki (zamieniana na datetime dopiero przy zapisie)
         """
         # Dodanie wpisu do bufora
         self.buffer.append((timestamp, sensor_id, value, unit))
 
-        # Sprawdzenie czy trzeba wywołać flush
+        # Sprawdzenie czy trzeba wywołać flush, a po nim warunków rotacji
         if len(self.buffer) >= self.buffer_size:
             self._flush_buffer()
-
-        # Sprawdzenie warunków rotacji
-        self._check_rotation()
+            self._check_rotation()
 
     def read_logs(
             self,
@@ -108,38 +151,62 @@ class Logger:
         for csv_file in glob.glob(os.path.join(self.log_dir, "*.csv")):
             yield from self._read_log_file(csv_file, start, end, sensor_id)
 
+        # Pliki czekające na archiwizację są listowane przed archiwami, więc plik spakowany
+        # w trakcie odczytu trafia do wyniku dokładnie raz - jako CSV albo jako ZIP
+        archive_dir = os.path.join(self.log_dir, "archive")
+        pending_dir = os.path.join(archive_dir, "pending")
+        pending_names = os.listdir(pending_dir)
+        with os.scandir(archive_dir) as entries:
+            zip_names = [entry.name for entry in entries if entry.name.endswith(".zip")]
+
+        archived = set(zip_names)
+        for name in pending_names:
+            if f"{name}.zip" in archived:
+                continue  # już spakowany - odczytany niżej z archiwum
+            try:
+                f = open(os.path.join(pending_dir, name), 'r')
+            except FileNotFoundError:
+                # Spakowany po wylistowaniu archiwów (ZIP powstaje przed usunięciem pliku)
+                yield from self._read_zip_file(os.path.join(archive_dir, f"{name}.zip"), start, end, sensor_id)
+                continue
+            with f:
+                yield from self._read_log_file(f, start, end, sensor_id)
+
         # Przeszukanie archiwalnych plików ZIP
-        for zip_file in glob.glob(os.path.join(self.log_dir, "archive", "*.zip")):
-            yield from self._read_zip_file(zip_file, start, end, sensor_id)
+        for name in zip_names:
+            yield from self._read_zip_file(os.path.join(archive_dir, name), start, end, sensor_id)
 
     def _flush_buffer(self) -> None:
         """Zapisuje zawartość bufora do pliku."""
         if not self.buffer or not self.current_writer:
             return
 
-        for entry in self.buffer:
-            self.current_writer.writerow(entry)
-            self.line_count += 1
+        self.current_writer.writerows(
+            (_from_ns(timestamp) if isinstance(timestamp, int) else timestamp, sensor_id, value, unit)
+            for timestamp, sensor_id, value, unit in self.buffer
+        )
+        self.line_count += len(self.buffer)
+        self.buffer.clear()
 
         self.current_file.flush()
-        self.buffer.clear()
+        self.bytes_written = self.current_file.tell()
 
     def _check_rotation(self) -> None:
         """Sprawdza warunki rotacji i wykonuje ją jeśli potrzeba."""
         if not self.current_file:
             return
 
-        current_time = datetime.now()
         need_rotation = False
 
         # Sprawdzenie warunków rotacji
-        if self.rotate_every_hours and self.last_rotation_time:
-            hours_since_last_rotation = (current_time - self.last_rotation_time).total_seconds() / 3600
+        if self.rotate_every_hours and self.last_rotation_time is not None:
+            hours_since_last_rotation = (time.monotonic() - self.last_rotation_time) / 3600
             if hours_since_last_rotation >= self.rotate_every_hours:
                 need_rotation = True
 
         if self.max_size_mb:
-            file_size_mb = os.path.getsize(self.current_file.name) / (1024 * 1024)
+            # Rozmiar pliku zapamiętany przy ostatnim flushu - bez wywołania stat()
+            file_size_mb = self.bytes_written / (1024 * 1024)
             if file_size_mb >= self.max_size_mb:
                 need_rotation = True
 
@@ -150,29 +217,65 @@ class Logger:
             self._rotate()
 
     def _rotate(self) -> None:
-        """Wykonuje rotację pliku logu."""
-        self.stop()
-        self._archive_current_file()
-        self._clean_old_archives()
+        """Wykonuje rotację pliku logu. Kompresja i czyszczenie archiwów odbywa się w tle."""
+        self._close_file()
+        pending = self._detach_current_file()
         self.start()
+        if pending is not None:
+            self._work_q.put(pending)
 
-    def _archive_current_file(self) -> None:
-        """Archiwizuje bieżący plik logu."""
+    def _detach_current_file(self) -> Optional[Tuple[str, str, str]]:
+        """
+        Przenosi zamknięty plik logu pod unikalną nazwę do archive/pending, żeby nowy plik
+        mógł od razu powstać pod starą. Zwraca (ścieżka, nazwa w archiwum, prefiks daty)
+        dla wątku roboczego.
+        """
         if not self.current_filename:
-            return
+            return None
 
         source_path = os.path.join(self.log_dir, self.current_filename)
         if not os.path.exists(source_path):
-            return
+            return None
 
-        # Utworzenie nazwy archiwum (z datą utworzenia)
+        # Data utworzenia odczytana przed przeniesieniem (rename zmienia ctime)
         creation_time = datetime.fromtimestamp(os.path.getctime(source_path))
-        archive_name = f"{creation_time.strftime('%Y%m%d_%H%M%S')}_{self.current_filename}.zip"
+        stamp = creation_time.strftime('%Y%m%d_%H%M%S')
+
+        # Kilka rotacji w tej samej sekundzie nie może nadpisać odłożonego pliku ani archiwum
+        archive_dir = os.path.join(self.log_dir, "archive")
+        prefix, n = stamp, 0
+        while (os.path.exists(os.path.join(archive_dir, "pending", f"{prefix}_{self.current_filename}"))
+               or os.path.exists(os.path.join(archive_dir, f"{prefix}_{self.current_filename}.zip"))):
+            n += 1
+            prefix = f"{stamp}_{n}"
+
+        pending_path = os.path.join(archive_dir, "pending", f"{prefix}_{self.current_filename}")
+        os.replace(source_path, pending_path)
+        return pending_path, self.current_filename, prefix
+
+    def _archive_worker(self) -> None:
+        """Pętla wątku roboczego: archiwizuje odłożone pliki i usuwa stare archiwa."""
+        while True:
+            source_path, arcname, prefix = self._work_q.get()
+            try:
+                self._archive_file(source_path, arcname, prefix)
+                self._clean_old_archives()
+            except Exception as e:
+                print(f"Błąd archiwizacji: {e}")
+            finally:
+                self._work_q.task_done()
+
+    def _archive_file(self, source_path: str, arcname: str, prefix: str) -> None:
+        """Archiwizuje zamknięty plik logu."""
+        archive_name = f"{prefix}_{arcname}.zip"
         archive_path = os.path.join(self.log_dir, "archive", archive_name)
 
-        # Kompresja do ZIP
-        with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            zipf.write(source_path, arcname=self.current_filename)
+        # Kompresja do ZIP (pod tymczasową nazwą, by read_logs nie trafił na niepełne archiwum).
+        # Poziom 1 - logi CSV kompresują się prawie tak samo dobrze, a kilka razy szybciej
+        tmp_path = archive_path + ".tmp"
+        with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=ARCHIVE_COMPRESSLEVEL) as zipf:
+            zipf.write(source_path, arcname=arcname)
+        os.replace(tmp_path, archive_path)
 
         # Usunięcie oryginalnego pliku
         os.remove(source_path)
@@ -180,57 +283,110 @@ class Logger:
     def _clean_old_archives(self) -> None:
         """Usuwa archiwa starsze niż [retention_days] dni."""
         archive_dir = os.path.join(self.log_dir, "archive")
-        cutoff_time = datetime.now() - timedelta(days=self.retention_days)
+        cutoff_ts = (datetime.now() - timedelta(days=self.retention_days)).timestamp()
 
-        for archive in glob.glob(os.path.join(archive_dir, "*.zip")):
-            creation_time = datetime.fromtimestamp(os.path.getctime(archive))
-            if creation_time < cutoff_time:
-                os.remove(archive)
+        # DirEntry zapamiętuje wynik stat(), więc na plik przypada jedno wywołanie systemowe
+        with os.scandir(archive_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".zip") and entry.stat().st_ctime < cutoff_ts:
+                    os.remove(entry.path)
 
     def _read_log_file(
             self,
-            filepath: str,
+            source,
+            start: datetime,
+            end: datetime,
+            sensor_id: Optional[str] = None
+    ) -> Iterator[Dict]:
+        """Odczytuje wpisy z pojedynczego pliku CSV (ścieżka lub otwarty plik tekstowy)."""
+        if isinstance(source, str):
+            try:
+                f = open(source, 'r')
+            except FileNotFoundError:
+                return
+            with f:
+                yield from self._read_log_file(f, start, end, sensor_id)
+            return
+
+        if _pandas() is not None:
+            yield from self._read_frame(source, start, end, sensor_id)
+            return
+
+        reader = csv.reader(source)
+
+        # Check if file is empty before trying to skip header
+        try:
+            header = next(reader)
+        except StopIteration:
+            return  # Empty file, return empty generator
+
+        if len(header) != 4:  # Basic validation
+            return
+
+        for row in reader:
+            if len(row) != 4:
+                continue
+
+            try:
+                timestamp = datetime.fromisoformat(row[0])
+                row_sensor_id = row[1]
+                value = float(row[2])
+                unit = row[3]
+
+                # Filtrowanie wyników
+                if start <= timestamp <= end:
+                    if sensor_id is None or row_sensor_id == sensor_id:
+                        yield {
+                            "timestamp": timestamp,
+                            "sensor_id": row_sensor_id,
+                            "value": value,
+                            "unit": unit
+                        }
+            except (ValueError, IndexError):
+                continue
+
+    def _read_frame(
+            self,
+            source,
             start: datetime,
             end: datetime,
             sensor_id: Optional[str] = None
     ) -> Iterator[Dict]:
-        """Odczytuje wpisy z pojedynczego pliku CSV."""
+        """Odczytuje wpisy z pliku CSV (ścieżka lub obiekt pliku) przy pomocy pandas."""
+        pd = _pandas()
         try:
-            with open(filepath, 'r') as f:
-                reader = csv.reader(f)
-
-                # Check if file is empty before trying to skip header
-                try:
-                    header = next(reader)
-                except StopIteration:
-                    return  # Empty file, return empty generator
-
-                if len(header) != 4:  # Basic validation
-                    return
-
-                for row in reader:
-                    if len(row) != 4:
-                        continue
-
-                    try:
-                        timestamp = datetime.strptime(row[0], "%Y-%m-%d %H:%M:%S.%f")
-                        row_sensor_id = row[1]
-                        value = float(row[2])
-                        unit = row[3]
-
-                        # Filtrowanie wyników
-                        if start <= timestamp <= end:
-                            if sensor_id is None or row_sensor_id == sensor_id:
-                                yield {
-                                    "timestamp": timestamp,
-                                    "sensor_id": row_sensor_id,
-                                    "value": value,
-                                    "unit": unit
-                                }
-                    except (ValueError, IndexError):
-                        continue
-        except FileNotFoundError:
+            df = pd.read_csv(source, dtype=str, keep_default_na=False, on_bad_lines="skip")
+        except pd.errors.EmptyDataError:
+            return
+
+        if len(df.columns) != 4:  # Basic validation
             return
+        df.columns = ["timestamp", "sensor_id", "value", "unit"]
+
+        # Wiersze z niepoprawną datą lub wartością są pomijane (NaT/NaN)
+        df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601", errors="coerce")
+        df["value"] = pd.to_numeric(df["value"], errors="coerce")
+        df = df[df.notna().all(axis=1)]
+
+        # Filtrowanie wyników
+        mask = (df["timestamp"] >= start) & (df["timestamp"] <= end)
+        if sensor_id is not None:
+            mask &= df["sensor_id"] == sensor_id
+        df = df[mask]
+
+        for timestamp, row_sensor_id, value, unit in zip(
+                # datetime, a nie pd.Timestamp - tak samo jak przy odczycie modułem csv
+                df["timestamp"].array.to_pydatetime(),
+                df["sensor_id"].tolist(),
+                df["value"].tolist(),
+                df["unit"].tolist()
+        ):
+            yield {
+                "timestamp": timestamp,
+                "sensor_id": row_sensor_id,
+                "value": value,
+                "unit": unit
+            }
 
     def test_empty_file_handling(self):
         """Test czy logger poprawnie obsługuje puste pliki."""
@@ -260,6 +416,11 @@ class Logger:
                 if not filename.endswith('.csv'):
                     continue
 
+                if _pandas() is not None:
+                    with zipf.open(filename) as f:
+                        yield from self._read_frame(f, start, end, sensor_id)
+                    continue
+
                 with zipf.open(filename) as f:
                     # Konwersja do tekstu
                     content = f.read().decode('utf-8').splitlines()
@@ -271,7 +432,7 @@ class Logger:
                             continue
 
                         try:
-                            timestamp = datetime.strptime(row[0], "%Y-%m-%d %H:%M:%S.%f")
+                            timestamp = datetime.fromisoformat(row[0])
                             row_sensor_id = row[1]
                             value = float(row[2])
                             unit = row[3]
@@ -1,11 +1,32 @@
 import socket
+import struct
 import json
 import time
 import logging
 from network.config import load_config
 
+try:
+    import msgpack
+except ImportError:  # msgpack is optional; without it the client always sends JSON
+    msgpack = None
+
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:  # orjson is optional; the stdlib fallback emits the same compact JSON
+    def _dumps(data: dict) -> bytes:
+        return json.dumps(data, separators=(",", ":")).encode('utf-8')
+
+    _loads = json.loads
+
+# Each message is a 4-byte big-endian length followed by a JSON or MessagePack payload
+HEADER = struct.Struct(">I")
+ACK = b"ACK"
+
 class NetworkClient:
-    def __init__(self, host=None, port=None, timeout=5.0, retries=3):
+    def __init__(self, host=None, port=None, timeout=5.0, retries=3, use_msgpack=False):
         config = load_config()
         self.host = host or config['host']
         self.port = port or config['port']
@@ -13,6 +34,9 @@ class NetworkClient:
         self.retries = retries or config['retries']
         self.sock = None
         self.logger = logging.getLogger("NetworkClient")
+        self.use_msgpack = use_msgpack and msgpack is not None
+        if use_msgpack and msgpack is None:
+            self.logger.warning("msgpack not installed, sending JSON")
 
     def connect(self) -> None:
         try:
@@ -26,11 +50,11 @@ class NetworkClient:
         payload = self._serialize(data)
         for attempt in range(1, self.retries + 1):
             try:
-                self.sock.sendall(payload + b'\n')
+                self.sock.sendall(HEADER.pack(len(payload)) + payload)
                 self.logger.info(f"Sent: {data}")
 
-                ack = self.sock.recv(1024).decode().strip()
-                if ack == "ACK":
+                ack = self._recv_exact(len(ACK))
+                if ack == ACK:
                     self.logger.info("Acknowledgment received.")
                     return True
                 else:
@@ -41,13 +65,36 @@ class NetworkClient:
 
         return False
 
+    def send_reading(self, sensor_id: str, value: float, unit: str) -> bool:
+        # Epoch nanoseconds travel as a plain integer; the server never parses a date string
+        return self.send({
+            "sensor_id": sensor_id,
+            "timestamp_ns": time.time_ns(),
+            "value": value,
+            "unit": unit
+        })
+
     def close(self) -> None:
         if self.sock:
             self.sock.close()
             self.logger.info("Connection closed.")
 
+    def _recv_exact(self, size: int) -> bytes:
+        buf = bytearray()
+        while len(buf) < size:
+            chunk = self.sock.recv(size - len(buf))
+            if not chunk:
+                break
+            buf += chunk
+        return bytes(buf)
+
     def _serialize(self, data: dict) -> bytes:
-        return json.dumps(data).encode('utf-8')
+        if self.use_msgpack:
+            return msgpack.packb(data)
+        return _dumps(data)
 
     def _deserialize(self, raw: bytes) -> dict:
-        return json.loads(raw.decode('utf-8'))
\ No newline at end of file
+        # Same rule as the server: JSON objects start with "{" (after any whitespace), anything else is MessagePack
+        if raw.lstrip()[:1] != b"{" and msgpack is not None:
+            return msgpack.unpackb(raw)
+        return _loads(raw)
\ No newline at end of file
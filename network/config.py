@@ -1,11 +1,22 @@
+import functools
 import yaml
 import os
-print("Current working directory:", os.getcwd())
 
-def load_config(path: str = None) -> dict:
-    if path is None:
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        path = os.path.join(base_dir, 'config.yaml')
-    print("Loading config from:", path)
+# libyaml-backed loader is several times faster; plain SafeLoader when libyaml is missing
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _default_path() -> str:
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_dir, 'config.yaml')
+
+
+@functools.lru_cache(maxsize=None)
+def _load_config_file(path: str) -> dict:
     with open(path, 'r') as f:
-        return yaml.safe_load(f)
\ No newline at end of file
+        return yaml.load(f, Loader=_Loader)
+
+
+def load_config(path: str = None) -> dict:
+    # Parsed once per path; callers get their own shallow copy
+    return dict(_load_config_file(path or _default_path()))
\ No newline at end of file
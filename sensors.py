@@ -1,7 +1,12 @@
-import random
 import time
 from datetime import datetime
-from typing import Callable, List
+from typing import Callable, Dict
+
+import numpy as np
+
+RNG_BUFFER_SIZE = 1024
+HISTORY_CAPACITY = 4096
+
 
 class Sensor:
     def __init__(self, sensor_id, name, unit, min_value, max_value, frequency=1):
@@ -18,54 +23,165 @@ class Sensor:
         self.sensor_id = sensor_id
         self.name = name
         self.unit = unit
-        self.min_value = min_value
-        self.max_value = max_value
+        # Zapis z pominięciem właściwości - przedziały liczone są raz, na końcu konstruktora
+        self._min_value = min_value
+        self._max_value = max_value
         self.frequency = frequency
         self.active = True
         self.last_value = None
-        self.history = []
-        self._callbacks: List[Callable[[str, datetime, float, str], None]] = []
+        # Historia odczytów w buforze cyklicznym - pamięta HISTORY_CAPACITY ostatnich wartości
+        self._cap = HISTORY_CAPACITY
+        self._hist = np.empty(self._cap, dtype=np.float64)
+        self._hist_n = 0
+        self._hist_head = 0
+        # Słownik jako zbiór z zachowaną kolejnością - rejestracja i usuwanie w O(1)
+        self._callbacks: Dict[Callable[[str, datetime, float, str], None], None] = {}
+        # Postać callbacków używana przy odczycie, odświeżana przy (wy)rejestrowaniu
+        self._cb_single = None
+        self._cb_many = ()
+
+        # Bufor liczb losowych z [0, 1) generowanych hurtowo przez NumPy
+        self._rng = np.random.default_rng()
+        self._buf_size = RNG_BUFFER_SIZE
+        self._buf = None
+        self._idx = self._buf_size
+
+        # Przedziały losowania liczone z góry - każdy jako (dolna granica, szerokość)
+        self._update_bounds()
+
+    @property
+    def min_value(self):
+        return self._min_value
+
+    @min_value.setter
+    def min_value(self, value):
+        self._min_value = value
+        self._update_bounds()
+
+    @property
+    def max_value(self):
+        return self._max_value
+
+    @max_value.setter
+    def max_value(self, value):
+        self._max_value = value
+        self._update_bounds()
+
+    def _update_bounds(self):
+        """
+        Wylicza przedział losowania odczytów.
+        Wywoływana ponownie przy każdej zmianie min_value / max_value.
+        """
+        self._lo = float(self.min_value)
+        self._scale = float(self.max_value - self.min_value)
 
     def register_callback(self, callback: Callable[[str, datetime, float, str], None]) -> None:
         """Rejestruje funkcję callback (np. logger.log_reading)."""
-        self._callbacks.append(callback)
+        self._callbacks[callback] = None
+        self._update_dispatch()
 
     def unregister_callback(self, callback: Callable[[str, datetime, float, str], None]) -> None:
-        """Usuwa callback z listy."""
+        """Usuwa zarejestrowany callback."""
         if callback in self._callbacks:
-            self._callbacks.remove(callback)
+            del self._callbacks[callback]
+            self._update_dispatch()
 
-    def _notify_callbacks(self, value: float) -> None:
-        """Wywołuje wszystkie zarejestrowane callbacki."""
-        timestamp = datetime.now()
-        for callback in self._callbacks:
+    def _update_dispatch(self) -> None:
+        """Przy jednym callbacku zapamiętuje go osobno, przy wielu - jako krotkę."""
+        if len(self._callbacks) == 1:
+            self._cb_single, self._cb_many = next(iter(self._callbacks)), ()
+        else:
+            self._cb_single, self._cb_many = None, tuple(self._callbacks)
+
+    @property
+    def history(self):
+        """Zwraca zapamiętane odczyty (od najstarszego) jako tablicę NumPy."""
+        if self._hist_n < self._cap:
+            return self._hist[:self._hist_n].copy()
+        return np.concatenate((self._hist[self._hist_head:], self._hist[:self._hist_head]))
+
+    def _append_history(self, value: float) -> None:
+        """Zapisuje odczyt w buforze, nadpisując najstarszy po jego zapełnieniu."""
+        self._hist[self._hist_head] = value
+        self._hist_head = (self._hist_head + 1) % self._cap
+        self._hist_n = min(self._hist_n + 1, self._cap)
+
+    def _notify_callbacks(self, value: float, timestamp: datetime = None) -> None:
+        """
+        Wywołuje wszystkie zarejestrowane callbacki.
+        Bez podanego znacznika czasu używa bieżącego czasu.
+        """
+        if timestamp is None:
+            timestamp = datetime.now()
+        # Atrybuty odczytywane raz na odczyt, a nie raz na każdy callback
+        sensor_id, unit = self.sensor_id, self.unit
+
+        callback = self._cb_single
+        if callback is not None:
+            # Typowy przypadek: jeden obserwator (logger), bez pętli
             try:
-                callback(self.sensor_id, timestamp, value, self.unit)
+                callback(sensor_id, timestamp, value, unit)
             except Exception as e:
                 print(f"Błąd callbacka: {e}")
+            return
 
-    def read_value(self):
+        for callback in self._cb_many:
+            try:
+                callback(sensor_id, timestamp, value, unit)
+            except Exception as e:
+                print(f"Błąd callbacka: {e}")
+
+    def _next_unit(self):
+        """
+        Zwraca kolejną losową wartość z przedziału [0, 1).
+        Liczby są losowane paczkami po RNG_BUFFER_SIZE.
+        """
+        if self._idx >= self._buf_size:
+            self._buf = self._rng.random(self._buf_size).tolist()
+            self._idx = 0
+        u = self._buf[self._idx]
+        self._idx += 1
+        return u
+
+    def read_value(self, timestamp: datetime = None):
         """
         Symuluje pobranie odczytu z czujnika.
         W klasie bazowej zwraca losową wartość z przedziału [min_value, max_value].
+
+        :param timestamp: Znacznik czasu przekazywany callbackom - przy odczycie wielu
+                          czujników naraz wystarczy pobrać go raz dla wszystkich
         """
         if not self.active:
             raise Exception(f"Czujnik {self.name} jest wyłączony.")
 
-        value = random.uniform(self.min_value, self.max_value)
+        value = self._sample()
         self.last_value = value
-        self.history.append(value)
+        self._append_history(value)
 
-        self._notify_callbacks(value)  # Powiadomienie loggera/obserwatorów
+        self._notify_callbacks(value, timestamp)  # Powiadomienie loggera/obserwatorów
         return value
 
+    def _sample(self):
+        """
+        Losuje wartość odczytu bez efektów ubocznych (historia, last_value, callbacki).
+        Klasy pochodne nadpisują tę metodę zamiast read_value.
+        """
+        return self._lo + self._scale * self._next_unit()
+
+    def _first_value(self):
+        """Ustala last_value przed pierwszym odczytem - bez zapisu w historii i powiadomień."""
+        if not self.active:
+            raise Exception(f"Czujnik {self.name} jest wyłączony.")
+        self.last_value = self._sample()
+        return self.last_value
+
     def calibrate(self, calibration_factor):
         """
         Kalibruje ostatni odczyt przez przemnożenie go przez calibration_factor.
-        Jeśli nie wykonano jeszcze odczytu, wykonuje go najpierw.
+        Jeśli nie wykonano jeszcze odczytu, losuje wartość początkową.
         """
         if self.last_value is None:
-            self.read_value()
+            self._first_value()
 
         self.last_value *= calibration_factor
         return self.last_value
@@ -75,9 +191,28 @@ class Sensor:
         Zwraca ostatnią wygenerowaną wartość, jeśli była wygenerowana.
         """
         if self.last_value is None:
-            return self.read_value()
+            return self._first_value()
         return self.last_value
 
+    def run_forever(self, callback: Callable[[float], None] = None) -> None:
+        """
+        Wykonuje odczyty co `frequency` sekund, dopóki czujnik jest włączony.
+        Terminy kolejnych odczytów liczone są od stałego punktu startu (zegar monotoniczny),
+        więc czas samego odczytu i callbacka nie powoduje przesuwania się harmonogramu.
+
+        :param callback: Opcjonalna funkcja wywoływana z każdą odczytaną wartością
+        """
+        next_time = time.monotonic()
+        while self.active:
+            value = self.read_value()
+            if callback is not None:
+                callback(value)
+
+            next_time += self.frequency
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
     def start(self):
         """
         Włącza czujnik.
@@ -99,22 +234,20 @@ class LightSensor(Sensor):
         super().__init__(sensor_id, name, unit, min_value, max_value, frequency)
         self.daytime = daytime
 
-    def read_value(self):
-        if not self.active:
-            raise Exception(f"Czujnik {self.name} jest wyłączony.")
-
-        if self.daytime == "day":
-            value = random.uniform(self.max_value/3, self.max_value)
-        elif self.daytime == "night":
-            value = random.uniform(self.min_value, self.max_value/3)
-        else:
+    def _update_bounds(self):
+        """Wylicza przedziały natężenia światła dla dnia i nocy."""
+        min_v, max_v = float(self.min_value), float(self.max_value)
+        self._daytime_bounds = {
+            "day": (max_v / 3, max_v - max_v / 3),
+            "night": (min_v, max_v / 3 - min_v),
+        }
+
+    def _sample(self):
+        bounds = self._daytime_bounds.get(self.daytime)
+        if bounds is None:
             raise Exception("Nieprawidłowy czas dnia.")
-
-        self.last_value = value
-        self.history.append(self.last_value)
-
-        super()._notify_callbacks(value)
-        return value
+        low, scale = bounds
+        return low + scale * self._next_unit()
 
 class TemperatureSensor(Sensor):
     def __init__(self, sensor_id = "2", name="Temperature Sensor", unit="C", min_value=-20, max_value=50, frequency=1, daytime="day", season="summer"):
@@ -122,32 +255,26 @@ class TemperatureSensor(Sensor):
         self.daytime = daytime
         self.season = season
 
-    def read_value(self):
-        if not self.active:
-            raise Exception(f"Czujnik {self.name} jest wyłączony.")
-
-        if self.season == "spring":
-            value = random.uniform(self.min_value-0.6*self.min_value, self.max_value-0.8*self.max_value)
-        elif self.season == "summer":
-            value = random.uniform(self.min_value-2*self.min_value, self.max_value)
-        elif self.season == "autumn":
-            value = random.uniform(self.min_value-0.8*self.min_value, self.max_value-0.7*self.max_value)
-        elif self.season == "winter":
-            value = random.uniform(self.min_value, self.max_value-0.9*self.max_value)
-        else:
+    def _update_bounds(self):
+        """Wylicza przedziały odczytów dla pór roku."""
+        min_v, max_v = float(self.min_value), float(self.max_value)
+        self._season_bounds = {
+            "spring": (min_v * 0.4, max_v * 0.2 - min_v * 0.4),
+            "summer": (-min_v, max_v + min_v),
+            "autumn": (min_v * 0.2, max_v * 0.3 - min_v * 0.2),
+            "winter": (min_v, max_v * 0.1 - min_v),
+        }
+
+    def _sample(self):
+        bounds = self._season_bounds.get(self.season)
+        if bounds is None:
             raise Exception("Nieprawidłowy sezon.")
-
-        if self.daytime == "day":
-            pass
-        elif self.daytime == "night":
-            value = value - 10
-        else:
+        if self.daytime not in ("day", "night"):
             raise Exception("Nieprawidłowy czas dnia.")
-
-        self.last_value = value
-        self.history.append(self.last_value)
-
-        super()._notify_callbacks(value)
+        low, scale = bounds
+        value = low + scale * self._next_unit()
+        if self.daytime == "night":
+            value -= 10
         return value
 
 class HumiditySensor(Sensor):
@@ -155,40 +282,30 @@ class HumiditySensor(Sensor):
         super().__init__(sensor_id, name, unit, min_value, max_value, frequency)
         self.temperature = temperature
 
-    def read_value(self):
-        if not self.active:
-            raise Exception(f"Czujnik {self.name} jest wyłączony.")
-
-        if self.temperature > -20 and self.temperature <= 10:
-            value = random.uniform(self.min_value+self.max_value*0.5, self.max_value*0.8)
-        elif self.temperature > 10 and self.temperature <= 25:
-            value = random.uniform(self.min_value+self.max_value*0.3, self.max_value*0.6)
-        elif self.temperature > 25 and self.temperature <= 40:
-            value = random.uniform(self.min_value+self.max_value*0.2, self.max_value*0.4)
+    def _update_bounds(self):
+        """Wylicza przedziały wilgotności dla kolejnych zakresów temperatury."""
+        min_v, max_v = float(self.min_value), float(self.max_value)
+        self._humidity_bounds = (
+            (min_v + max_v * 0.5, max_v * 0.3 - min_v),   # -20 < t <= 10
+            (min_v + max_v * 0.3, max_v * 0.3 - min_v),   # 10 < t <= 25
+            (min_v + max_v * 0.2, max_v * 0.2 - min_v),   # 25 < t <= 40
+        )
+
+    def _sample(self):
+        if -20 < self.temperature <= 10:
+            low, scale = self._humidity_bounds[0]
+        elif 10 < self.temperature <= 25:
+            low, scale = self._humidity_bounds[1]
+        elif 25 < self.temperature <= 40:
+            low, scale = self._humidity_bounds[2]
         else:
             raise Exception("Nieprawidłowa temperatura.")
-
-        self.last_value = value
-        self.history.append(self.last_value)
-
-        super()._notify_callbacks(value)
-        return value
+        return low + scale * self._next_unit()
 
 class AirQualitySensor(Sensor):
     def __init__(self, sensor_id = "4", name="Air Quality Sensor", unit="AQI", min_value=0, max_value=500, frequency=1):
         super().__init__(sensor_id, name, unit, min_value, max_value, frequency)
 
-    def read_value(self):
-        if not self.active:
-            raise Exception(f"Czujnik {self.name} jest wyłączony.")
-        value = random.uniform(self.min_value, self.max_value)
-        self.last_value = value
-
-        super()._notify_callbacks(value)
-        return value
-
 if __name__ == "__main__":
     sensor = LightSensor(daytime="night")
-    while True:
-        print(sensor.read_value())
-        time.sleep(1)
+    sensor.run_forever(print)
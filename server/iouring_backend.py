@@ -0,0 +1,182 @@
+"""
+Optional io_uring backend for NetworkServer.
+
+Needs Linux >= 6.1 and the `liburing` package. NetworkServer uses the asyncio
+loop whenever available() returns False.
+
+The binding does not release the GIL while waiting for completions, so the
+wait is capped at WAIT_TIMEOUT to give other threads in the process a turn.
+"""
+import errno
+import os
+import platform
+import socket
+import sys
+
+try:
+    import liburing as uring
+except ImportError:  # liburing is optional
+    uring = None
+
+from server.server import HEADER, ACK, MAX_FRAME_SIZE, tune_socket
+
+MIN_KERNEL = (6, 1)
+QUEUE_DEPTH = 256
+RECV_SIZE = 65536
+CQE_BATCH = 64  # completions handled per submit/wait round trip
+WAIT_TIMEOUT = 0.01  # seconds; longest the GIL is held while waiting for completions
+
+# user_data layout: operation in the high 32 bits, file descriptor in the low 32 bits
+OP_ACCEPT = 1
+OP_RECV = 2
+OP_SEND = 3
+OP_CLOSE = 4
+
+
+def kernel_ok() -> bool:
+    try:
+        version = tuple(int(part) for part in platform.release().split("-")[0].split(".")[:2])
+    except ValueError:
+        return False
+    return version >= MIN_KERNEL
+
+
+def available() -> bool:
+    return uring is not None and sys.platform == "linux" and kernel_ok()
+
+
+def _result(entry) -> int:
+    # The binding raises OSError for a negative result; turn it back into -errno
+    try:
+        return entry.res
+    except OSError as e:
+        return -(e.errno or errno.EIO)
+
+
+class IoUringLoop:
+    def __init__(self, server):
+        # server is the owning NetworkServer: provides port, reuse_port and _handle_payload
+        self.server = server
+        self.ring = uring.Ring()
+        self.cqe = uring.Cqe()
+        self.listener = None
+        self.buffers = {}  # fd -> bytearray the in-flight recv writes into
+        self.pending = {}  # fd -> bytes received but not yet split into frames
+
+        # Created disabled: the thread that calls run() enables it and becomes the single issuer
+        uring.io_uring_queue_init(
+            QUEUE_DEPTH, self.ring,
+            uring.IORING_SETUP_SINGLE_ISSUER | uring.IORING_SETUP_DEFER_TASKRUN
+            | uring.IORING_SETUP_COOP_TASKRUN | uring.IORING_SETUP_R_DISABLED
+        )
+
+    def run(self) -> None:
+        try:
+            uring.io_uring_enable_rings(self.ring)
+            self.listener = socket.create_server(("0.0.0.0", self.server.port), reuse_port=self.server.reuse_port)
+            # Accepted sockets inherit these options from the listener on Linux
+            tune_socket(self.listener)
+            self._prep_accept()
+            print(f"[SERVER] Listening on port {self.server.port} (io_uring)...")
+            timeout = uring.timespec(WAIT_TIMEOUT)
+            while True:
+                # One syscall submits everything queued by the previous batch and waits for more.
+                # The binding holds the GIL while it waits, so the wait is bounded: returning to
+                # the interpreter lets the process's other threads (e.g. the logger) run
+                try:
+                    uring.io_uring_submit_and_wait_timeout(self.ring, self.cqe, 1, timeout)
+                except OSError as e:
+                    if e.errno not in (errno.ETIME, errno.EINTR):
+                        raise
+                self._reap()
+        finally:
+            uring.io_uring_queue_exit(self.ring)
+            if self.listener is not None:
+                self.listener.close()
+
+    def _reap(self) -> None:
+        # CqeIter follows the ring mask, so a batch may wrap past the end of the completion queue
+        seen = 0
+        for _ in uring.CqeIter(self.ring, self.cqe):
+            entry = self.cqe[0]
+            self._complete(entry.user_data, _result(entry), entry.flags)
+            seen += 1
+            if seen == CQE_BATCH:
+                break
+        uring.io_uring_cq_advance(self.ring, seen)
+
+    def _get_sqe(self, op: int, fd: int):
+        sqe = uring.io_uring_get_sqe(self.ring)
+        if sqe is None:
+            # Submission queue full - hand the queued entries to the kernel and retry
+            uring.io_uring_submit(self.ring)
+            sqe = uring.io_uring_get_sqe(self.ring)
+        sqe.user_data = (op << 32) | fd
+        return sqe
+
+    def _prep_accept(self) -> None:
+        # Multishot: one submission keeps producing a completion per accepted client
+        sqe = self._get_sqe(OP_ACCEPT, self.listener.fileno())
+        uring.io_uring_prep_multishot_accept(sqe, self.listener.fileno())
+
+    def _prep_recv(self, fd: int) -> None:
+        sqe = self._get_sqe(OP_RECV, fd)
+        uring.io_uring_prep_recv(sqe, fd, self.buffers[fd])
+
+    def _prep_send(self, fd: int) -> None:
+        # Linked to the next SQE on this fd, so the follow-up recv starts in the kernel once the ACK is out
+        sqe = self._get_sqe(OP_SEND, fd)
+        uring.io_uring_prep_send(sqe, fd, ACK)
+        sqe.flags |= uring.IOSQE_IO_LINK
+
+    def _prep_close(self, fd: int) -> None:
+        self.buffers.pop(fd, None)
+        self.pending.pop(fd, None)
+        sqe = self._get_sqe(OP_CLOSE, fd)
+        uring.io_uring_prep_close(sqe, fd)
+
+    def _complete(self, user_data: int, res: int, flags: int) -> None:
+        op, fd = user_data >> 32, user_data & 0xFFFFFFFF
+
+        if op == OP_ACCEPT:
+            if res >= 0:
+                self.buffers[res] = bytearray(RECV_SIZE)
+                self.pending[res] = b""
+                self._prep_recv(res)
+            if not flags & uring.IORING_CQE_F_MORE:
+                self._prep_accept()  # kernel ended the multishot accept - re-arm it
+        elif op == OP_RECV:
+            if res <= 0:
+                self._prep_close(fd)  # client disconnected or recv failed
+                return
+            data = self.pending[fd] + self.buffers[fd][:res]
+            try:
+                data = self._handle_frames(fd, data)
+            except Exception as e:
+                print(f"[fd {fd}] Error: {e}")
+                self._prep_close(fd)
+                return
+            self.pending[fd] = data
+            self._prep_recv(fd)
+        elif op == OP_CLOSE and res == -errno.ECANCELED:
+            # Cancelled because a send linked before it failed - the fd is still open, close it
+            # directly. Any other close error has already freed the fd number, which a later
+            # accept may have reused, so it must not be closed again
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _handle_frames(self, fd: int, data: bytes) -> bytes:
+        """Processes every complete frame in data and returns the unconsumed tail."""
+        while len(data) >= HEADER.size:
+            (length,) = HEADER.unpack_from(data)
+            if length > MAX_FRAME_SIZE:
+                raise ValueError(f"frame of {length} bytes exceeds MAX_FRAME_SIZE")
+            end = HEADER.size + length
+            if len(data) < end:
+                break
+            self.server._handle_payload(data[HEADER.size:end])
+            self._prep_send(fd)
+            data = data[end:]
+        return data
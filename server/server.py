@@ -1,43 +1,190 @@
+import asyncio
+import multiprocessing
+import os
+import signal
 import socket
+import struct
 import json
 import threading
+import time
 from datetime import datetime
+from typing import Any, Callable, Optional, Union, cast
 from logger import Logger
 
+try:
+    import msgspec
+except ImportError:  # msgspec is optional; without it readings are decoded into dicts
+    msgspec = None  # type: ignore[assignment]
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional; msgspec can decode MessagePack payloads on its own
+    msgpack = None  # type: ignore[assignment]
+
+_loads: Callable[[bytes], Any]
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # orjson is optional
+    _loads = json.loads
+
+# Each message is a 4-byte big-endian length followed by a JSON or MessagePack payload
+HEADER = struct.Struct(">I")
+ACK = b"ACK"
+RECV_BUFFER_SIZE = 65536
+# A reading is ~100 bytes; a longer length header is a broken or hostile client
+MAX_FRAME_SIZE = 65536
+SOCKET_BUFFER_SIZE = 262144
+# Lets several listeners share the port; not available on every platform
+REUSE_PORT = hasattr(socket, "SO_REUSEPORT")
+# First byte of a MessagePack map (fixmap, map 16, map 32); a reading is always a map
+MSGPACK_MAP_MARKERS = frozenset(range(0x80, 0x90)) | {0xDE, 0xDF}
+PARENT_POLL_INTERVAL = 1.0  # seconds between a worker's checks that the parent is still alive
+
+def tune_socket(sock) -> None:
+    # ACKs are tiny, so Nagle's algorithm would hold each one back waiting for more data
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+
+if msgspec is not None:
+    # Built with defstruct rather than a class statement so the module stays compilable with mypyc
+    Reading = msgspec.defstruct("Reading", [
+        ("sensor_id", str),
+        ("value", float),
+        ("unit", str),
+        # A float is accepted and truncated, as int() does in _process_data
+        ("timestamp_ns", Optional[Union[int, float]], None),
+        # Older clients send an ISO 8601 string; parsed with fromisoformat, as in _process_data
+        ("timestamp", Optional[str], None),
+    ])
+
 class NetworkServer:
-    def __init__(self, port: int, logger: Logger):
+    def __init__(self, port: int, logger: Logger, use_io_uring: bool = False, reuse_port: bool = False):
         self.port = port
         self.logger = logger
+        self.use_io_uring = use_io_uring
+        # Only start_multiprocess workers share the port; a lone server must fail if it is taken
+        self.reuse_port = reuse_port
+        # Parse and validate a payload straight into a Reading. strict=False lets numeric
+        # strings through, so the same payloads are accepted with or without msgspec
+        if msgspec is not None:
+            self._decoder = msgspec.json.Decoder(Reading, strict=False)
+            self._msgpack_decoder = msgspec.msgpack.Decoder(Reading, strict=False)
+        else:
+            self._decoder = self._msgpack_decoder = None
 
     def start(self) -> None:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server_socket:
-            server_socket.bind(("0.0.0.0", self.port))
-            server_socket.listen()
-            print(f"[SERVER] Listening on port {self.port}...")
+        if self.use_io_uring:
+            from server import iouring_backend
+
+            if iouring_backend.available():
+                iouring_backend.IoUringLoop(self).run()
+                return
+            print("[SERVER] io_uring not available, using asyncio")
+
+        asyncio.run(self._serve())
+
+    def start_multiprocess(self, workers: Optional[int] = None) -> None:
+        """
+        Runs one server process per worker, all bound to the same port via SO_REUSEPORT
+        so the kernel spreads connections between them. Readings are sent back over a
+        queue and logged by this process, so there is still a single logger. The workers
+        are stopped when this process exits, is terminated or is killed.
+        """
+        if not REUSE_PORT:
+            print("[SERVER] SO_REUSEPORT not available, using a single process")
+            self.start()
+            return
+
+        # SIGTERM would otherwise end this process without running the finally below,
+        # leaving the workers bound to the port. Handlers can only be set from the main thread
+        previous_handler = None
+        if threading.current_thread() is threading.main_thread():
+            previous_handler = signal.signal(signal.SIGTERM, _exit_on_signal)
 
+        readings: multiprocessing.SimpleQueue = multiprocessing.SimpleQueue()
+        processes = [
+            multiprocessing.Process(
+                target=_run_worker, args=(self.port, readings, self.use_io_uring, os.getpid()), daemon=True
+            )
+            for _ in range(workers or os.cpu_count() or 1)
+        ]
+        try:
+            for process in processes:
+                process.start()
             while True:
-                client_socket, addr = server_socket.accept()
-                threading.Thread(target=self._handle_client, args=(client_socket, addr)).start()
-
-    def _handle_client(self, client_socket, addr) -> None:
-        with client_socket:
-            try:
-                raw_data = b""
-                while not raw_data.endswith(b"\n"):
-                    chunk = client_socket.recv(1024)
-                    if not chunk:
-                        return
-                    raw_data += chunk
-
-                data = json.loads(raw_data.decode("utf-8"))
-                self._process_data(data)
-                client_socket.sendall(b"ACK\n")
-            except Exception as e:
-                print(f"[{addr}] Error: {e}")
+                self.logger.log_reading(*readings.get())
+        finally:
+            for process in processes:
+                if process.pid is not None:
+                    process.terminate()
+                    process.join()
+            if previous_handler is not None:
+                signal.signal(signal.SIGTERM, previous_handler)
+
+    async def _serve(self) -> None:
+        # One event loop multiplexes all client connections instead of a thread per client
+        loop = asyncio.get_running_loop()
+        server = await loop.create_server(
+            lambda: _ClientProtocol(self), "0.0.0.0", self.port, reuse_port=self.reuse_port
+        )
+        print(f"[SERVER] Listening on port {self.port}...")
+        async with server:
+            await server.serve_forever()
+
+    def _handle_payload(self, raw: bytes) -> None:
+        # A JSON reading is an object, so its payload starts with "{" (after any whitespace);
+        # anything else is MessagePack
+        is_json = raw.lstrip()[:1] == b"{"
+        if self._decoder is None:
+            if is_json:
+                self._process_data(_loads(raw))
+            elif msgpack is not None:
+                self._process_data(msgpack.unpackb(raw))
+            else:
+                raise ValueError("MessagePack payload received but msgpack is not installed")
+            return
+
+        # Bytes that do not parse, or parse to something other than an object, fail the frame
+        # (and close the connection) on the dict path too - only a bad reading is acknowledged
+        if not is_json and (not raw or raw[0] not in MSGPACK_MAP_MARKERS):
+            raise ValueError("payload is neither a JSON object nor a MessagePack map")
+        try:
+            reading: Any = (self._decoder if is_json else self._msgpack_decoder).decode(raw)
+        except msgspec.ValidationError as e:
+            print(f"[ERROR] Invalid data format: {e}")
+            return
+
+        timestamp: Union[datetime, int]
+        try:
+            if reading.timestamp_ns is not None:
+                timestamp = int(reading.timestamp_ns)
+            elif reading.timestamp is not None:
+                timestamp = datetime.fromisoformat(reading.timestamp)
+            else:
+                print("[ERROR] Invalid data format: missing timestamp")
+                return
+        except ValueError as e:
+            print(f"[ERROR] Invalid data format: {e}")
+            return
+
+        self.logger.log_reading(
+            sensor_id=reading.sensor_id,
+            timestamp=timestamp,
+            value=reading.value,
+            unit=reading.unit
+        )
 
     def _process_data(self, data: dict) -> None:
+        timestamp: Union[datetime, int]
         try:
-            timestamp = datetime.fromisoformat(data["timestamp"])
+            # Epoch nanoseconds are passed on as-is; the logger converts them when writing
+            if "timestamp_ns" in data:
+                timestamp = int(data["timestamp_ns"])
+            else:
+                timestamp = datetime.fromisoformat(data["timestamp"])
             sensor_id = data["sensor_id"]
             value = float(data["value"])
             unit = data["unit"]
@@ -50,3 +197,90 @@ class NetworkServer:
             )
         except (KeyError, ValueError) as e:
             print(f"[ERROR] Invalid data format: {e}")
+
+
+class _QueueLogger:
+    """Stands in for the Logger in worker processes: forwards readings to the parent."""
+
+    def __init__(self, readings: multiprocessing.SimpleQueue):
+        self.readings = readings
+
+    def log_reading(self, sensor_id: str, timestamp: Union[datetime, int], value: float, unit: str) -> None:
+        self.readings.put((sensor_id, timestamp, value, unit))
+
+
+def _exit_on_signal(signum: int, frame: Any) -> None:
+    raise SystemExit(128 + signum)
+
+
+def _watch_parent(parent_pid: int) -> None:
+    # A parent killed without cleanup (e.g. SIGKILL) cannot terminate its workers;
+    # once it is gone the worker is reparented, and leaves instead of holding the port
+    while os.getppid() == parent_pid:
+        time.sleep(PARENT_POLL_INTERVAL)
+    os._exit(0)
+
+
+def _run_worker(port: int, readings: multiprocessing.SimpleQueue, use_io_uring: bool, parent_pid: int) -> None:
+    threading.Thread(target=_watch_parent, args=(parent_pid,), daemon=True).start()
+    NetworkServer(port, cast(Logger, _QueueLogger(readings)), use_io_uring, reuse_port=True).start()
+
+
+class _ClientProtocol(asyncio.BufferedProtocol):
+    """Receives a client's frames straight into one preallocated buffer."""
+
+    def __init__(self, server: NetworkServer):
+        self.server = server
+        self.buf = bytearray(RECV_BUFFER_SIZE)
+        self.view = memoryview(self.buf)
+        self.used = 0  # bytes at the start of buf not yet consumed as frames
+        self.needed = 0  # size of the frame currently being received
+        self.transport: asyncio.Transport
+        self.addr: Any = None  # peername tuple, shape depends on the address family
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = cast(asyncio.Transport, transport)
+        self.addr = transport.get_extra_info("peername")
+        tune_socket(transport.get_extra_info("socket"))
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        if self.needed > len(self.buf):
+            # Frame larger than the buffer - move the partial frame to a bigger one
+            buf = bytearray(self.needed)
+            buf[:self.used] = self.view[:self.used]
+            self.buf, self.view = buf, memoryview(buf)
+        return self.view[self.used:]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self.used += nbytes
+        try:
+            consumed = self._handle_frames()
+        except Exception as e:
+            print(f"[{self.addr}] Error: {e}")
+            self.transport.close()
+            return
+
+        if consumed:
+            # Keep an incomplete trailing frame at the start of the buffer
+            remaining = self.used - consumed
+            if remaining:
+                self.buf[:remaining] = bytes(self.view[consumed:self.used])
+            self.used = remaining
+
+    def _handle_frames(self) -> int:
+        """Processes every complete frame in the buffer and returns the bytes consumed."""
+        view, offset = self.view, 0
+        while self.used - offset >= HEADER.size:
+            (length,) = HEADER.unpack_from(view, offset)
+            if length > MAX_FRAME_SIZE:
+                raise ValueError(f"frame of {length} bytes exceeds MAX_FRAME_SIZE")
+            end = offset + HEADER.size + length
+            if end > self.used:
+                self.needed = HEADER.size + length
+                break
+            self.server._handle_payload(bytes(view[offset + HEADER.size:end]))
+            self.transport.write(ACK)
+            offset = end
+        else:
+            self.needed = 0
+        return offset
@@ -0,0 +1,49 @@
+import unittest
+
+try:
+    from gui import BucketedHistory
+except ImportError:  # gui needs numpy and tkinter
+    BucketedHistory = None
+
+NOW = 1_699_999_980  # start of a 60 s bucket
+
+
+@unittest.skipIf(BucketedHistory is None, "gui dependencies not installed")
+class TestBucketedHistory(unittest.TestCase):
+    def setUp(self):
+        self.history = BucketedHistory(hours=1, bucket_seconds=60)
+
+    def test_average_within_bucket(self):
+        self.history.add(NOW, 1.0)
+        self.history.add(NOW + 59, 3.0)
+        self.assertEqual(self.history.average(1, NOW + 59), 2.0)
+
+    def test_empty_window(self):
+        self.assertIsNone(self.history.average(1, NOW))
+
+    def test_ring_lap_replaces_slot(self):
+        # One hour later the same slot is reused; the old bucket's sum must not leak in
+        self.history.add(NOW, 100.0)
+        self.history.add(NOW + 3600, 2.0)
+        self.assertEqual(self.history.average(1, NOW + 3600), 2.0)
+
+    def test_late_reading_from_previous_lap_dropped(self):
+        self.history.add(NOW + 3600, 2.0)
+        self.history.add(NOW, 100.0)
+        self.assertEqual(self.history.average(1, NOW + 3600), 2.0)
+
+    def test_stale_slot_excluded(self):
+        # Nothing overwrote the slot, but its bucket has aged out of the window
+        self.history.add(NOW, 5.0)
+        self.assertEqual(self.history.average(1, NOW + 3599), 5.0)
+        self.assertIsNone(self.history.average(1, NOW + 3600))
+
+    def test_window_edges(self):
+        # Ring longer than the window, so the bucket one hour back still holds its reading
+        self.history = BucketedHistory(hours=2, bucket_seconds=60)
+        self.history.add(NOW - 3600, 100.0)  # exactly one hour back: outside
+        self.history.add(NOW - 3540, 1.0)    # oldest bucket inside
+        self.history.add(NOW, 3.0)           # current bucket: inside
+        self.history.add(NOW + 60, 100.0)    # next bucket: not yet in the window
+        self.assertEqual(self.history.average(1, NOW), 2.0)
+        self.assertEqual(self.history.average(1, NOW + 60), 51.5)  # window slid past the 1.0 bucket
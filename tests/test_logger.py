@@ -0,0 +1,178 @@
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import zipfile
+from datetime import datetime, timedelta
+from unittest import mock
+
+import logger
+from logger import Logger
+
+FILENAME = "sensors.csv"
+NOW = datetime(2026, 10, 15, 12, 0, 0)
+
+
+class LoggerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_dir = os.path.join(self.temp_dir, "logs")
+        self.archive_dir = os.path.join(self.log_dir, "archive")
+        self.pending_dir = os.path.join(self.archive_dir, "pending")
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+    def make_logger(self, **config) -> Logger:
+        config_path = os.path.join(self.temp_dir, "config.json")
+        with open(config_path, "w") as f:
+            json.dump({"log_dir": self.log_dir, "filename_pattern": FILENAME, "buffer_size": 1, **config}, f)
+        log = Logger(config_path)
+        self.addCleanup(log.stop)
+        return log
+
+    def log(self, log: Logger, count: int, sensor_id: str = "temp1") -> None:
+        for i in range(count):
+            log.log_reading(sensor_id, NOW + timedelta(seconds=i), 20.0 + i, "C")
+
+    def read_all(self, log: Logger) -> list:
+        return list(log.read_logs(NOW - timedelta(days=1), NOW + timedelta(days=1)))
+
+    def block_worker(self, log: Logger) -> threading.Event:
+        # Holds every archive job until the returned event is set
+        release = threading.Event()
+        archive_file = log._archive_file
+
+        def blocked(*args):
+            release.wait(5)
+            archive_file(*args)
+
+        log._archive_file = blocked
+        self.addCleanup(release.set)
+        return release
+
+
+class TestRotation(LoggerTestCase):
+    def test_rotation_hands_file_to_worker(self):
+        log = self.make_logger(rotate_after_lines=3)
+        release = self.block_worker(log)
+        self.log(log, 3)
+
+        # Rotated file waits in archive/pending; a fresh current file already took its name
+        self.assertEqual(len(os.listdir(self.pending_dir)), 1)
+        self.assertTrue(os.path.exists(os.path.join(self.log_dir, FILENAME)))
+
+        release.set()
+        log.stop()
+        self.assertEqual(os.listdir(self.pending_dir), [])
+        [archive] = [name for name in os.listdir(self.archive_dir) if name.endswith(".zip")]
+        with zipfile.ZipFile(os.path.join(self.archive_dir, archive)) as zipf:
+            self.assertEqual(zipf.namelist(), [FILENAME])
+            self.assertEqual(len(zipf.read(FILENAME).decode("utf-8").splitlines()), 4)  # header + 3 rows
+
+    def test_archive_written_under_tmp_name(self):
+        log = self.make_logger(rotate_after_lines=0)
+        self.log(log, 1)
+        log._close_file()
+        source_path, arcname, prefix = log._detach_current_file()
+        archive_path = os.path.join(self.archive_dir, f"{prefix}_{arcname}.zip")
+
+        seen = []
+        write = zipfile.ZipFile.write
+
+        def recording_write(zipf, *args, **kwargs):
+            seen.append(sorted(os.listdir(self.archive_dir)))
+            return write(zipf, *args, **kwargs)
+
+        with mock.patch.object(zipfile.ZipFile, "write", recording_write):
+            log._archive_file(source_path, arcname, prefix)
+
+        # While compressing only the .tmp name exists, so read_logs never opens a partial ZIP
+        self.assertEqual(seen, [sorted(["pending", os.path.basename(archive_path) + ".tmp"])])
+        self.assertEqual(sorted(os.listdir(self.archive_dir)), sorted(["pending", os.path.basename(archive_path)]))
+        self.assertFalse(os.path.exists(source_path))
+
+    def test_rotations_in_same_second_get_unique_names(self):
+        log = self.make_logger(rotate_after_lines=2)
+        release = self.block_worker(log)
+        with mock.patch("os.path.getctime", return_value=NOW.timestamp()):
+            self.log(log, 4)
+
+        stamp = NOW.strftime("%Y%m%d_%H%M%S")
+        self.assertEqual(sorted(os.listdir(self.pending_dir)), [f"{stamp}_1_{FILENAME}", f"{stamp}_{FILENAME}"])
+
+        release.set()
+        log.stop()
+        archives = sorted(name for name in os.listdir(self.archive_dir) if name.endswith(".zip"))
+        self.assertEqual(archives, [f"{stamp}_1_{FILENAME}.zip", f"{stamp}_{FILENAME}.zip"])
+
+    def test_stop_waits_for_archive_jobs(self):
+        log = self.make_logger(rotate_after_lines=2)
+        release = self.block_worker(log)
+        self.log(log, 4)
+        threading.Timer(0.2, release.set).start()
+
+        log.stop()
+        self.assertEqual(os.listdir(self.pending_dir), [])
+        self.assertEqual(len([name for name in os.listdir(self.archive_dir) if name.endswith(".zip")]), 2)
+
+
+class TestReadLogs(LoggerTestCase):
+    def test_pending_file_read_once(self):
+        log = self.make_logger(rotate_after_lines=3)
+        release = self.block_worker(log)
+        self.log(log, 3)
+        self.assertEqual(len(self.read_all(log)), 3)
+
+        # Worker has renamed the ZIP into place but not yet removed the pending file
+        [name] = os.listdir(self.pending_dir)
+        with zipfile.ZipFile(os.path.join(self.archive_dir, f"{name}.zip"), "w") as zipf:
+            zipf.write(os.path.join(self.pending_dir, name), arcname=FILENAME)
+        self.assertEqual(len(self.read_all(log)), 3)
+
+    def test_pending_file_archived_during_read(self):
+        # Detached by hand, so no archive job is queued for the worker
+        log = self.make_logger(rotate_after_lines=0)
+        self.log(log, 3)
+        log._close_file()
+        pending_path, arcname, prefix = log._detach_current_file()
+
+        # Archive the file after read_logs has listed both directories, before it opens the file
+        scandir = os.scandir
+
+        def scandir_then_archive(path):
+            with scandir(path) as it:
+                entries = list(it)
+            if path == self.archive_dir:
+                log._archive_file(pending_path, arcname, prefix)
+            return contextlib.nullcontext(entries)
+
+        with mock.patch("os.scandir", scandir_then_archive):
+            self.assertEqual(len(self.read_all(log)), 3)
+        self.assertFalse(os.path.exists(pending_path))
+
+
+    @unittest.skipIf(logger._pandas() is None, "pandas 2 not installed")
+    def test_pandas_and_csv_readers_match(self):
+        log = self.make_logger(rotate_after_lines=4)
+        self.log(log, 4, sensor_id="temp1")  # rotated and archived into a ZIP
+        self.log(log, 3, sensor_id="hum1")   # stays in the current CSV
+        log.stop()
+        with open(os.path.join(self.log_dir, FILENAME), "a") as f:
+            f.write("not a date,hum1,1.0,%\n2026-10-15T12:00:00,hum1,warm,%\n2026-10-15T12:00:00,hum1\n")
+        self.assertEqual(len([name for name in os.listdir(self.archive_dir) if name.endswith(".zip")]), 1)
+
+        for sensor_id in (None, "hum1"):
+            with self.subTest(sensor_id=sensor_id):
+                with_pandas = list(log.read_logs(NOW, NOW + timedelta(seconds=2), sensor_id))
+                with mock.patch("logger._pandas", return_value=None):
+                    with_csv = list(log.read_logs(NOW, NOW + timedelta(seconds=2), sensor_id))
+                self.assertEqual(with_pandas, with_csv)
+                self.assertEqual(len(with_csv), 3 if sensor_id else 6)
+                # Both readers hand out plain datetimes, not pd.Timestamp
+                self.assertEqual({type(record["timestamp"]) for record in with_pandas + with_csv}, {datetime})
+
+
+if __name__ == "__main__":
+    unittest.main()
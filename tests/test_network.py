@@ -1,15 +1,39 @@
+import socket
 import unittest
-from network.client import NetworkClient
+from network.client import NetworkClient, HEADER, msgpack
 
 class TestNetworkClient(unittest.TestCase):
     def test_serialize(self):
         client = NetworkClient()
         data = {"sensor_id": "temp1", "value": 23.5}
         serialized = client._serialize(data)
-        self.assertEqual(serialized, b'{"sensor_id": "temp1", "value": 23.5}')
+        self.assertEqual(serialized, b'{"sensor_id":"temp1","value":23.5}')
 
     def test_deserialize(self):
         client = NetworkClient()
         raw = b'{"sensor_id": "temp1", "value": 23.5}'
         deserialized = client._deserialize(raw)
         self.assertEqual(deserialized, {"sensor_id": "temp1", "value": 23.5})
+
+    def test_deserialize_leading_whitespace(self):
+        client = NetworkClient()
+        raw = b'\n  {"sensor_id": "temp1", "value": 23.5}'
+        self.assertEqual(client._deserialize(raw), {"sensor_id": "temp1", "value": 23.5})
+
+    def test_send_length_prefixed_frame(self):
+        client = NetworkClient()
+        client.sock, server_sock = socket.socketpair()
+        with client.sock, server_sock:
+            server_sock.sendall(b"ACK")
+            self.assertTrue(client.send({"sensor_id": "temp1", "value": 23.5}))
+
+            (length,) = HEADER.unpack(server_sock.recv(HEADER.size))
+            payload = server_sock.recv(length)
+            self.assertEqual(client._deserialize(payload), {"sensor_id": "temp1", "value": 23.5})
+
+    @unittest.skipIf(msgpack is None, "msgpack not installed")
+    def test_serialize_msgpack(self):
+        client = NetworkClient(use_msgpack=True)
+        serialized = client._serialize({"sensor_id": "temp1", "value": 23.5})
+        self.assertNotEqual(serialized[:1], b"{")
+        self.assertEqual(client._deserialize(serialized), {"sensor_id": "temp1", "value": 23.5})
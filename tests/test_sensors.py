@@ -0,0 +1,161 @@
+import contextlib
+import io
+import unittest
+
+try:
+    import sensors
+except ImportError:  # sensors needs numpy
+    sensors = None
+
+READS = 500
+EPSILON = 1e-9  # low + scale * u may round just past the upper bound
+
+
+class CallbackRecorder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, sensor_id, timestamp, value, unit):
+        self.calls.append((sensor_id, value, unit))
+
+
+@unittest.skipIf(sensors is None, "numpy not installed")
+class TestHistory(unittest.TestCase):
+    def test_history_before_wrap(self):
+        sensor = sensors.Sensor("0", "Test", "u", 0, 1)
+        values = [sensor.read_value() for _ in range(10)]
+        self.assertEqual(sensor.history.tolist(), values)
+
+    def test_history_keeps_newest_in_order_after_wrap(self):
+        sensor = sensors.Sensor("0", "Test", "u", 0, 1)
+        values = [sensor.read_value() for _ in range(sensors.HISTORY_CAPACITY * 2 + 10)]
+        self.assertEqual(sensor.history.tolist(), values[-sensors.HISTORY_CAPACITY:])
+
+    def test_history_is_a_copy(self):
+        sensor = sensors.Sensor("0", "Test", "u", 0, 1)
+        sensor.read_value()
+        sensor.history[0] = -1.0
+        self.assertNotEqual(sensor.history[0], -1.0)
+
+
+@unittest.skipIf(sensors is None, "numpy not installed")
+class TestCallbacks(unittest.TestCase):
+    def test_read_value_notifies_callback(self):
+        sensor = sensors.TemperatureSensor()
+        recorder = CallbackRecorder()
+        sensor.register_callback(recorder)
+        value = sensor.read_value()
+        self.assertEqual(recorder.calls, [("2", value, "C")])
+
+    def test_calibrate_and_get_last_value_do_not_notify(self):
+        sensor = sensors.TemperatureSensor()
+        recorder = CallbackRecorder()
+        sensor.register_callback(recorder)
+
+        first = sensor.get_last_value()
+        self.assertEqual(sensor.calibrate(2), first * 2)
+        self.assertEqual(sensor.get_last_value(), first * 2)
+        self.assertEqual(recorder.calls, [])
+        self.assertEqual(len(sensor.history), 0)
+
+    def test_unregister_callback(self):
+        sensor = sensors.Sensor("0", "Test", "u", 0, 1)
+        kept, removed = CallbackRecorder(), CallbackRecorder()
+        sensor.register_callback(kept)
+        sensor.register_callback(removed)
+        sensor.unregister_callback(removed)
+        sensor.unregister_callback(removed)  # no longer registered - ignored
+        sensor.read_value()
+        self.assertEqual(len(kept.calls), 1)
+        self.assertEqual(removed.calls, [])
+
+        sensor.unregister_callback(kept)
+        sensor.read_value()
+        self.assertEqual(len(kept.calls), 1)
+
+    def test_failing_callback_does_not_stop_others(self):
+        sensor = sensors.Sensor("0", "Test", "u", 0, 1)
+        recorder = CallbackRecorder()
+        sensor.register_callback(lambda *reading: 1 / 0)
+        sensor.register_callback(recorder)
+        with contextlib.redirect_stdout(io.StringIO()):
+            sensor.read_value()
+        self.assertEqual(len(recorder.calls), 1)
+
+
+@unittest.skipIf(sensors is None, "numpy not installed")
+class TestSampledRanges(unittest.TestCase):
+    # Ranges of the original random.uniform(low, high) implementation
+    def assert_in_range(self, sensor, low, high):
+        for _ in range(READS):
+            value = sensor.read_value()
+            self.assertGreaterEqual(value, low - EPSILON)
+            self.assertLessEqual(value, high + EPSILON)
+
+    def test_base_sensor(self):
+        self.assert_in_range(sensors.Sensor("0", "Test", "u", -5, 5), -5, 5)
+
+    def test_light(self):
+        min_v, max_v = 0, 10000
+        for daytime, low, high in (("day", max_v / 3, max_v), ("night", min_v, max_v / 3)):
+            with self.subTest(daytime=daytime):
+                self.assert_in_range(sensors.LightSensor(daytime=daytime), low, high)
+
+    def test_temperature(self):
+        for min_v, max_v in ((-20, 50), (-10, 40)):
+            seasons = {
+                "spring": (min_v - 0.6 * min_v, max_v - 0.8 * max_v),
+                "summer": (min_v - 2 * min_v, max_v),
+                "autumn": (min_v - 0.8 * min_v, max_v - 0.7 * max_v),
+                "winter": (min_v, max_v - 0.9 * max_v),
+            }
+            for season, (low, high) in seasons.items():
+                for daytime, shift in (("day", 0), ("night", -10)):
+                    with self.subTest(min_value=min_v, max_value=max_v, season=season, daytime=daytime):
+                        sensor = sensors.TemperatureSensor(
+                            min_value=min_v, max_value=max_v, season=season, daytime=daytime
+                        )
+                        self.assert_in_range(sensor, low + shift, high + shift)
+
+    def test_humidity(self):
+        min_v, max_v = 0, 100
+        bands = (
+            (-19, min_v + max_v * 0.5, max_v * 0.8),
+            (10, min_v + max_v * 0.5, max_v * 0.8),
+            (11, min_v + max_v * 0.3, max_v * 0.6),
+            (25, min_v + max_v * 0.3, max_v * 0.6),
+            (26, min_v + max_v * 0.2, max_v * 0.4),
+            (40, min_v + max_v * 0.2, max_v * 0.4),
+        )
+        for temperature, low, high in bands:
+            with self.subTest(temperature=temperature):
+                self.assert_in_range(sensors.HumiditySensor(temperature=temperature), low, high)
+
+    def test_changed_limits_take_effect(self):
+        sensor = sensors.Sensor("0", "Test", "u", 0, 1)
+        sensor.min_value, sensor.max_value = 100, 200
+        self.assert_in_range(sensor, 100, 200)
+
+        # Winter range is [min_value, 0.1 * max_value]
+        sensor = sensors.TemperatureSensor(season="winter")
+        sensor.max_value = 100
+        self.assert_in_range(sensor, -20, 10)
+        sensor.min_value = 5
+        self.assert_in_range(sensor, 5, 10)
+
+    def test_invalid_settings_raise(self):
+        for sensor in (
+            sensors.LightSensor(daytime="dusk"),
+            sensors.TemperatureSensor(season="monsoon"),
+            sensors.TemperatureSensor(daytime="dusk"),
+            sensors.HumiditySensor(temperature=-20),
+            sensors.HumiditySensor(temperature=41),
+        ):
+            with self.subTest(sensor=sensor):
+                with self.assertRaises(Exception):
+                    sensor.read_value()
+                self.assertEqual(len(sensor.history), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,432 @@
+import contextlib
+import errno
+import io
+import json
+import os
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from network.client import NetworkClient, msgpack
+from server import iouring_backend
+from server.server import NetworkServer, HEADER, ACK, MAX_FRAME_SIZE, RECV_BUFFER_SIZE, msgspec, _ClientProtocol
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs the server in its own process: the io_uring wait must not share a GIL with the test clients
+SERVER_SCRIPT = """
+import sys
+from server.server import NetworkServer
+
+class NullLogger:
+    def log_reading(self, **reading):
+        pass
+
+NetworkServer(int(sys.argv[1]), NullLogger(), use_io_uring=sys.argv[2] == "1").start()
+"""
+
+# Two workers behind one parent; the parent appends each reading it logs to the file in argv[3]
+MULTIPROCESS_SCRIPT = """
+import sys
+from server.server import NetworkServer
+
+class FileLogger:
+    def log_reading(self, *reading):
+        with open(sys.argv[3], "a") as f:
+            f.write(repr(reading) + "\\n")
+
+NetworkServer(int(sys.argv[1]), FileLogger(), use_io_uring=sys.argv[2] == "1").start_multiprocess(2)
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def frame(payload: dict) -> bytes:
+    data = json.dumps(payload).encode("utf-8")
+    return HEADER.pack(len(data)) + data
+
+
+def recv_exact(sock: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def wait_until(predicate, timeout: float = 5) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def port_free(port: int) -> bool:
+    # Binding without SO_REUSEPORT fails while any worker still listens on the port
+    try:
+        socket.create_server(("0.0.0.0", port)).close()
+    except OSError:
+        return False
+    return True
+
+
+def count_lines(path: str) -> int:
+    try:
+        with open(path) as f:
+            return sum(1 for _ in f)
+    except FileNotFoundError:
+        return 0
+
+
+READING = {"sensor_id": "temp1", "timestamp_ns": 1700000000000000000, "value": 23.5, "unit": "C"}
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.readings = []
+
+    def log_reading(self, **reading):
+        self.readings.append(reading)
+
+
+class FakeTransport:
+    def __init__(self):
+        self.written = []
+        self.closed = False
+
+    def write(self, data: bytes) -> None:
+        self.written.append(data)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class ServerProcess:
+    def __init__(self, use_io_uring: bool, script: str = SERVER_SCRIPT, *args: str):
+        self.port = free_port()
+        self.process = subprocess.Popen(
+            [sys.executable, "-c", script, str(self.port), "1" if use_io_uring else "0", *args],
+            cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=1).close()
+                return
+            except OSError:
+                if time.monotonic() > deadline or self.process.poll() is not None:
+                    self.stop()
+                    raise RuntimeError("server did not start")
+                time.sleep(0.05)
+
+    def stop(self) -> None:
+        self.process.kill()
+        self.process.wait()
+
+
+class TestNetworkServer(unittest.TestCase):
+    def setUp(self):
+        self.logger = RecordingLogger()
+        self.server = NetworkServer(port=0, logger=self.logger)
+
+    def test_json_payload(self):
+        self.server._handle_payload(NetworkClient()._serialize(READING))
+        self.assertEqual(self.logger.readings, [
+            {"sensor_id": "temp1", "timestamp": 1700000000000000000, "value": 23.5, "unit": "C"}
+        ])
+
+    def test_json_with_leading_whitespace(self):
+        self.server._handle_payload(b"\r\n\t " + json.dumps(READING).encode("utf-8"))
+        self.assertEqual(self.logger.readings, [
+            {"sensor_id": "temp1", "timestamp": 1700000000000000000, "value": 23.5, "unit": "C"}
+        ])
+
+    @unittest.skipIf(msgpack is None, "msgpack not installed")
+    def test_msgpack_payload(self):
+        self.server._handle_payload(NetworkClient(use_msgpack=True)._serialize(READING))
+        self.assertEqual(self.logger.readings, [
+            {"sensor_id": "temp1", "timestamp": 1700000000000000000, "value": 23.5, "unit": "C"}
+        ])
+
+
+class TestClientProtocol(unittest.TestCase):
+    def setUp(self):
+        self.logger = RecordingLogger()
+        self.protocol = _ClientProtocol(NetworkServer(port=0, logger=self.logger))
+        self.protocol.transport = FakeTransport()
+
+    def feed(self, *reads: bytes) -> None:
+        # Copies each read into the buffers the protocol hands out, as the event loop does
+        for data in reads:
+            while data and not self.protocol.transport.closed:
+                buf = self.protocol.get_buffer(-1)
+                size = min(len(buf), len(data))
+                buf[:size] = data[:size]
+                self.protocol.buffer_updated(size)
+                data = data[size:]
+
+    def test_header_split_across_reads(self):
+        data = frame(READING)
+        self.feed(data[:2], data[2:HEADER.size + 1], data[HEADER.size + 1:])
+        self.assertEqual(self.protocol.transport.written, [ACK])
+        self.assertEqual(len(self.logger.readings), 1)
+
+    def test_several_frames_in_one_read(self):
+        self.feed(frame(READING) * 3 + frame(READING)[:5])
+        self.assertEqual(self.protocol.transport.written, [ACK] * 3)
+        self.assertEqual(len(self.logger.readings), 3)
+        self.assertEqual(self.protocol.used, 5)  # start of the fourth frame is kept
+
+    def test_frame_larger_than_buffer(self):
+        # Padded to the largest allowed frame, which with its header no longer fits the initial buffer
+        payload = json.dumps(READING).encode("utf-8")
+        payload += b" " * (MAX_FRAME_SIZE - len(payload))
+        self.feed(HEADER.pack(len(payload)) + payload + frame(READING))
+        self.assertGreater(len(self.protocol.buf), RECV_BUFFER_SIZE)
+        self.assertEqual(self.protocol.transport.written, [ACK, ACK])
+        self.assertEqual(len(self.logger.readings), 2)
+
+    def test_oversize_header_closes_connection(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.feed(HEADER.pack(0xFFFFFFFF) + b"{")
+        self.assertTrue(self.protocol.transport.closed)
+        self.assertEqual(len(self.protocol.buf), RECV_BUFFER_SIZE)
+        self.assertEqual(self.protocol.transport.written, [])
+
+
+class TestPayloadDecoding(unittest.TestCase):
+    # Loosely typed payloads the dict path accepts; the msgspec path must log the same readings
+    PAYLOADS = [
+        {"sensor_id": "temp1", "value": "2.5", "unit": "C", "timestamp_ns": 1700000000000000000},
+        {"sensor_id": "temp1", "value": 2.5, "unit": "C", "timestamp": "2026-10-15T12:00"},
+        {"sensor_id": "temp1", "value": 2.5, "unit": "C", "timestamp_ns": 1.5e18},
+        {"sensor_id": "temp1", "value": 2.5, "unit": "C", "timestamp_ns": "1700000000000000000"},
+        {"sensor_id": "temp1", "value": "warm", "unit": "C", "timestamp_ns": 1700000000000000000},
+        {"sensor_id": "temp1", "value": 2.5, "unit": "C", "timestamp": "yesterday"},
+        {"sensor_id": "temp1", "value": 2.5, "unit": "C"},
+    ]
+
+    @unittest.skipIf(msgspec is None, "msgspec not installed")
+    def test_msgspec_matches_dict_path(self):
+        encoders = {"json": lambda payload: json.dumps(payload).encode("utf-8"), "msgpack": msgspec.msgpack.encode}
+        for payload in self.PAYLOADS:
+            for name, encode in encoders.items():
+                with self.subTest(payload=payload, encoding=name), contextlib.redirect_stdout(io.StringIO()):
+                    decoded, parsed = RecordingLogger(), RecordingLogger()
+                    NetworkServer(port=0, logger=decoded)._handle_payload(encode(payload))
+                    NetworkServer(port=0, logger=parsed)._process_data(payload)
+                    self.assertEqual(decoded.readings, parsed.readings)
+
+
+    # Bytes that are not a reading at all: both paths must close the connection without an ACK
+    MALFORMED = [
+        b"{bad json",
+        b'{"sensor_id": "temp1", "value": 2.5, "unit": "C", "timestamp_ns": 1} trailing',
+        b"[1,2]",
+        b"5",
+        b'"x"',
+        b"",
+        b"\xc1",
+        b"\x93\x01\x02\x03",  # MessagePack array
+    ]
+
+    def feed_frame(self, payload: bytes, use_msgspec: bool) -> tuple:
+        logger = RecordingLogger()
+        server = NetworkServer(port=0, logger=logger)
+        if not use_msgspec:
+            server._decoder = server._msgpack_decoder = None
+        protocol = _ClientProtocol(server)
+        protocol.transport = transport = FakeTransport()
+        data = HEADER.pack(len(payload)) + payload
+        protocol.get_buffer(-1)[:len(data)] = data
+        with contextlib.redirect_stdout(io.StringIO()):
+            protocol.buffer_updated(len(data))
+        return transport.written, transport.closed, logger.readings
+
+    @unittest.skipIf(msgspec is None, "msgspec not installed")
+    def test_malformed_frames_match_dict_path(self):
+        for payload in self.MALFORMED:
+            with self.subTest(payload=payload):
+                result = self.feed_frame(payload, use_msgspec=True)
+                self.assertEqual(result, ([], True, []))
+                self.assertEqual(result, self.feed_frame(payload, use_msgspec=False))
+
+        # An object that is not a reading is dropped but still acknowledged, on both paths
+        result = self.feed_frame(b'{"a": 1}', use_msgspec=True)
+        self.assertEqual(result, ([ACK], False, []))
+        self.assertEqual(result, self.feed_frame(b'{"a": 1}', use_msgspec=False))
+
+
+class TestIoUringCompletions(unittest.TestCase):
+    def close_completion(self, res: int) -> bool:
+        """Completes an OP_CLOSE with res for a live fd; returns whether the fd ended up closed."""
+        loop = object.__new__(iouring_backend.IoUringLoop)  # no ring needed for close completions
+        read_fd, write_fd = os.pipe()
+        self.addCleanup(os.close, write_fd)
+        loop._complete((iouring_backend.OP_CLOSE << 32) | read_fd, res, 0)
+        try:
+            os.fstat(read_fd)
+        except OSError:
+            return True
+        os.close(read_fd)
+        return False
+
+    def test_cancelled_close_closes_fd(self):
+        self.assertTrue(self.close_completion(-errno.ECANCELED))
+
+    def test_failed_close_leaves_fd_alone(self):
+        # The kernel already released the number; it may belong to a newly accepted client
+        self.assertFalse(self.close_completion(-errno.EIO))
+
+
+class TestServerLoad(unittest.TestCase):
+    CONNECTIONS = 20
+    ROUNDS = 30
+    FRAMES_PER_ROUND = 5  # 3000 recv/send completions - several laps of the 512-entry completion queue
+
+    def pipeline_clients(self, port: int) -> list:
+        failures = []
+
+        def client():
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=5) as sock:
+                    for _ in range(self.ROUNDS):
+                        sock.sendall(frame(READING) * self.FRAMES_PER_ROUND)
+                        acks = recv_exact(sock, len(ACK) * self.FRAMES_PER_ROUND)
+                        if acks != ACK * self.FRAMES_PER_ROUND:
+                            raise AssertionError(f"unexpected reply {acks!r}")
+            except Exception as e:
+                failures.append(e)
+
+        threads = [threading.Thread(target=client) for _ in range(self.CONNECTIONS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return failures
+
+    def check_backend(self, use_io_uring: bool) -> None:
+        server = ServerProcess(use_io_uring)
+        try:
+            self.assertEqual(self.pipeline_clients(server.port), [])
+        finally:
+            server.stop()
+
+    def test_asyncio_pipelined_connections(self):
+        self.check_backend(use_io_uring=False)
+
+    @unittest.skipUnless(iouring_backend.available(), "io_uring backend not available")
+    def test_io_uring_pipelined_connections(self):
+        self.check_backend(use_io_uring=True)
+
+
+class TestMultiprocessServer(unittest.TestCase):
+    FRAMES = 10
+
+    def check_shutdown(self, use_io_uring: bool, signum: int) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            log_path = os.path.join(tmp, "readings.log")
+            server = ServerProcess(use_io_uring, MULTIPROCESS_SCRIPT, log_path)
+            try:
+                # A connection per frame, so the kernel spreads them over both workers
+                for _ in range(self.FRAMES):
+                    with socket.create_connection(("127.0.0.1", server.port), timeout=5) as sock:
+                        sock.sendall(frame(READING))
+                        self.assertEqual(recv_exact(sock, len(ACK)), ACK)
+                self.assertTrue(wait_until(lambda: count_lines(log_path) == self.FRAMES))
+
+                server.process.send_signal(signum)
+                server.process.wait(timeout=5)
+                self.assertTrue(wait_until(lambda: port_free(server.port)), "workers still hold the port")
+            finally:
+                server.stop()
+
+    def test_asyncio_workers_stop_on_sigterm(self):
+        self.check_shutdown(use_io_uring=False, signum=signal.SIGTERM)
+
+    @unittest.skipUnless(iouring_backend.available(), "io_uring backend not available")
+    def test_io_uring_workers_stop_on_sigterm(self):
+        self.check_shutdown(use_io_uring=True, signum=signal.SIGTERM)
+
+    def test_workers_exit_when_parent_killed(self):
+        # SIGKILL skips all cleanup in the parent; the workers notice on their own
+        self.check_shutdown(use_io_uring=False, signum=signal.SIGKILL)
+
+
+class TestServerErrors(unittest.TestCase):
+    def check_reset_client(self, use_io_uring: bool) -> None:
+        server = ServerProcess(use_io_uring)
+        try:
+            # Close with RST instead of FIN: the pending recv fails with ECONNRESET
+            sock = socket.create_connection(("127.0.0.1", server.port), timeout=5)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+            sock.sendall(frame(READING)[:5])
+            sock.close()
+            time.sleep(0.2)
+
+            with socket.create_connection(("127.0.0.1", server.port), timeout=5) as sock:
+                sock.sendall(frame(READING))
+                self.assertEqual(recv_exact(sock, len(ACK)), ACK)
+        finally:
+            server.stop()
+
+    def check_oversize_frame(self, use_io_uring: bool) -> None:
+        server = ServerProcess(use_io_uring)
+        try:
+            # The header alone must get the connection closed - no buffer is sized from it
+            with socket.create_connection(("127.0.0.1", server.port), timeout=5) as sock:
+                sock.sendall(HEADER.pack(MAX_FRAME_SIZE + 1) + b"{")
+                self.assertEqual(sock.recv(16), b"")
+
+            with socket.create_connection(("127.0.0.1", server.port), timeout=5) as sock:
+                sock.sendall(frame(READING))
+                self.assertEqual(recv_exact(sock, len(ACK)), ACK)
+        finally:
+            server.stop()
+
+    def check_port_in_use(self, use_io_uring: bool) -> None:
+        server = ServerProcess(use_io_uring)
+        try:
+            # SO_REUSEPORT is for start_multiprocess workers only - a second plain server must not bind
+            second = subprocess.run(
+                [sys.executable, "-c", SERVER_SCRIPT, str(server.port), "1" if use_io_uring else "0"],
+                cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10
+            )
+            self.assertNotEqual(second.returncode, 0)
+        finally:
+            server.stop()
+
+    def test_asyncio_survives_reset_client(self):
+        self.check_reset_client(use_io_uring=False)
+
+    @unittest.skipUnless(iouring_backend.available(), "io_uring backend not available")
+    def test_io_uring_survives_reset_client(self):
+        self.check_reset_client(use_io_uring=True)
+
+    def test_asyncio_closes_oversize_frame(self):
+        self.check_oversize_frame(use_io_uring=False)
+
+    @unittest.skipUnless(iouring_backend.available(), "io_uring backend not available")
+    def test_io_uring_closes_oversize_frame(self):
+        self.check_oversize_frame(use_io_uring=True)
+
+    def test_asyncio_refuses_port_in_use(self):
+        self.check_port_in_use(use_io_uring=False)
+
+    @unittest.skipUnless(iouring_backend.available(), "io_uring backend not available")
+    def test_io_uring_refuses_port_in_use(self):
+        self.check_port_in_use(use_io_uring=True)